@@ -1,15 +1,23 @@
 from functools import wraps
-from concurrent.futures import ThreadPoolExecutor
 import threading
+import time
+from contextvars import ContextVar
 import logging
 from datetime import datetime
 from pathlib import Path
+from collections import deque
+import hashlib
 import json
+import math
+import os
 import pickle
-from typing import Dict, Any, Optional, List, Callable, Set
+import queue
+import struct
+from typing import IO, Dict, Any, Optional, List, Callable, Set, Tuple
 from dataclasses import dataclass
 import signal
 import sys
+import weakref
 
 from .exceptions import (
     WorkflowValidationError,
@@ -17,56 +25,23 @@ from .exceptions import (
     MissingDependencyError,
     WorkflowExecutionError,
     CheckpointError,
+    DependencyTimeoutError,
 )
+from .parameters import ParameterSpec, WorkflowParams
 from .utils import (
     Timer,
     Profiler,
+    check_resource_limits,
     monitor_resources,
     with_timeout,
     ensure_directory,
     create_unique_id,
-    get_dependencies_graph,
+    detect_cycle,
 )
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class ParameterSpec:
-    required: bool = False
-    default: Any = None
-    description: str = ""
-    type: Optional[type] = None
-
-
-class WorkflowParams:
-    def __init__(self, **parameter_specs: Dict[str, ParameterSpec]):
-        self.specs = parameter_specs
-
-    def validate(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        validated_params = {}
-        missing_params = []
-
-        # Check required parameters
-        for param_name, spec in self.specs.items():
-            if spec.required and param_name not in params:
-                missing_params.append(param_name)
-            elif param_name not in params and spec.default is not None:
-                validated_params[param_name] = spec.default
-            elif param_name in params:
-                value = params[param_name]
-                if spec.type and not isinstance(value, spec.type):
-                    raise TypeError(
-                        f"Parameter '{param_name}' must be of type {spec.type.__name__}, got {type(value).__name__}"
-                    )
-                validated_params[param_name] = value
-
-        if missing_params:
-            raise ValueError(f"Missing required parameters: {', '.join(missing_params)}")
-
-        return validated_params
-
-
 @dataclass
 class WorkflowNode:
     func: Callable
@@ -76,86 +51,395 @@ class WorkflowNode:
     timeout_seconds: Optional[int] = None
     memory_limit_mb: Optional[float] = None
     cpu_limit_percent: Optional[float] = None
+    # Execution level, assigned when the generator sorts the graph
+    level: Optional[int] = None
+
+
+def _canonical(value: Any, path: str = "params") -> Any:
+    """Normalize value to plain JSON types the way json.dumps would encode it.
+
+    Tuples become lists and str/int/float subclasses (enums, numpy floats, ...)
+    their base values. Raises CheckpointError for values with no JSON form.
+    """
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return str.__str__(value)
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise CheckpointError(f"Cannot hash {path}: {value!r} has no JSON representation")
+        return float(value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item, f"{path}[{i}]") for i, item in enumerate(value)]
+    if isinstance(value, dict):
+        for key in value:
+            if not isinstance(key, str):
+                raise CheckpointError(f"Cannot hash {path}: key {key!r} is not a string")
+        return {
+            str.__str__(key): _canonical(item, f"{path}[{key!r}]") for key, item in value.items()
+        }
+    raise CheckpointError(
+        f"Cannot hash {path}: {type(value).__name__} values have no JSON representation"
+    )
+
+
+def _dumps_sorted(obj: Any) -> bytes:
+    """Serialize obj to compact JSON bytes with sorted keys."""
+    return json.dumps(
+        obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, allow_nan=False
+    ).encode()
+
+
+def _hash_params(params: Dict[str, Any]) -> str:
+    return hashlib.blake2b(_dumps_sorted(_canonical(params)), digest_size=16).hexdigest()
+
+
+# Checkpoints are a sequence of pickled records, each prefixed by its length
+_FRAME_HEADER = struct.Struct(">I")
+
+
+class _CheckpointWriter:
+    """Background thread appending the completed functions of one workflow run to disk."""
+
+    debounce_seconds = 0.1
+    _STOP = object()
+
+    def __init__(self, workflow: "Workflow"):
+        self._workflow = workflow
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self.error: Optional[CheckpointError] = None
+
+    def start(self):
+        self._thread.start()
+
+    def put(self, function_name: str, result: Any, completed_at: float):
+        self._queue.put((function_name, result, completed_at))
+
+    def drain(self) -> List[Tuple[str, Any, float]]:
+        """Take every completion currently queued without blocking."""
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return batch
+            if item is self._STOP:
+                # Leave the stop request for the writer thread
+                self._queue.put(item)
+                return batch
+            batch.append(item)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            batch = [item]
+            stopping = False
+            # Completions arriving within the debounce window share a single write
+            deadline = time.monotonic() + self.debounce_seconds
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                self._workflow._append_records(batch)
+            except CheckpointError as e:
+                self.error = e
+            if stopping:
+                return
+
+    def close(self):
+        """Stop the thread once everything queued so far has been written."""
+        self._queue.put(self._STOP)
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+class _WorkerPool:
+    """Persistent threads running the ready nodes of one workflow run."""
+
+    _STOP = object()
+
+    def __init__(self, workflow: "Workflow", max_workers: int):
+        self._workflow = workflow
+        self._max_workers = max_workers
+        self._tasks: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._done: "queue.SimpleQueue[Tuple[int, Any, Optional[BaseException]]]" = (
+            queue.SimpleQueue()
+        )
+        self._threads: List[threading.Thread] = []
+        self._cancelled = threading.Event()
+        # Nodes submitted but not yet collected; only touched by the scheduling thread
+        self.pending = 0
+
+    def submit(self, index: int, func: Callable, params: Dict[str, Any]):
+        self.pending += 1
+        # Threads are started lazily, so narrow workflows never spawn the full pool
+        if len(self._threads) < min(self.pending, self._max_workers):
+            thread = threading.Thread(
+                target=self._work, name=f"workflow-worker-{len(self._threads)}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        self._tasks.put((index, func, params))
+
+    def next_completed(self) -> Tuple[int, Any]:
+        """Wait for the next node to finish, re-raising its exception if it failed."""
+        index, result, error = self._done.get()
+        self.pending -= 1
+        if error is not None:
+            raise error
+        return index, result
+
+    def _work(self):
+        while True:
+            task = self._tasks.get()
+            if task is self._STOP:
+                return
+            if self._cancelled.is_set():
+                # The run has already ended; drop the nodes queued behind it
+                continue
+            index, func, params = task
+            try:
+                self._done.put((index, self._workflow.run(func, params), None))
+            except BaseException as e:
+                self._done.put((index, None, e))
+
+    def close(self):
+        """Skip anything still queued and wait for running nodes to finish."""
+        self._cancelled.set()
+        for _ in self._threads:
+            self._tasks.put(self._STOP)
+        for thread in self._threads:
+            thread.join()
 
 
 class Workflow:
-    _results: Dict[str, Any] = {}
-    _lock = threading.Lock()
-    _checkpoint_dir = Path("workflow_checkpoints")
-    _status_file = _checkpoint_dir / "status.json"
+    """State of a single workflow run: results, completion condition and checkpoint file."""
 
-    @classmethod
-    def get_checkpoint_filename(cls, params: Dict[str, Any]) -> str:
-        param_str = json.dumps(params, sort_keys=True)
-        import hashlib
+    _checkpoint_dir = Path("workflow_checkpoints")
+    # One JSON line appended per completed function, across all runs
+    _status_file = _checkpoint_dir / "status.jsonl"
+    _running: "weakref.WeakSet[Workflow]" = weakref.WeakSet()
 
-        params_hash = hashlib.md5(param_str.encode()).hexdigest()
-        return f"checkpoint_{params_hash}.pkl"
+    def __init__(self):
+        self._results: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        # Notified whenever a result is stored, so dependents can stop waiting
+        self._cond = threading.Condition(self._lock)
+        self._params: Dict[str, Any] = {}
+        self._checkpoint_file: Optional[Path] = None
+        self._writer: Optional[_CheckpointWriter] = None
+        self._status_log: Optional[IO[bytes]] = None
+        # Serializes appends from the writer thread and explicit flushes
+        self._flush_lock = threading.RLock()
 
     @classmethod
-    def initialize(cls, params: Dict[str, Any]):
-        ensure_directory(cls._checkpoint_dir)
-        cls._results.clear()
-        cls.load_checkpoint(params)
+    def get_checkpoint_filename(cls, params: Dict[str, Any]) -> str:
+        return f"checkpoint_{_hash_params(params)}.pkl"
+
+    def _get_checkpoint_file(self, params: Dict[str, Any]) -> Path:
+        # Only the run's own params are memoized; load_checkpoint may be given others
+        if params is not self._params:
+            return self._checkpoint_dir / self.get_checkpoint_filename(params)
+        # Hashed once per run; every later save and load reuses the stored path
+        if self._checkpoint_file is None:
+            self._checkpoint_file = self._checkpoint_dir / self.get_checkpoint_filename(params)
+        return self._checkpoint_file
+
+    def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Call func with this workflow as the active run in the current thread."""
+        token = _active_workflow.set(self)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _active_workflow.reset(token)
+
+    def initialize(self, params: Dict[str, Any]):
+        ensure_directory(self._checkpoint_dir)
+        self._params = params
+        self._checkpoint_file = None
+        self._get_checkpoint_file(params)
+        self.load_checkpoint(params)
+        try:
+            self._status_log = open(self._status_file, "ab")
+        except OSError as e:
+            raise CheckpointError(f"Failed to open status file: {str(e)}")
+        self._writer = _CheckpointWriter(self)
+        self._writer.start()
+        Workflow._running.add(self)
+
+    def close(self):
+        """Write pending checkpoint records and stop the background writer."""
+        Workflow._running.discard(self)
+        try:
+            if self._writer is not None:
+                writer, self._writer = self._writer, None
+                writer.close()
+        finally:
+            if self._status_log is not None:
+                status_log, self._status_log = self._status_log, None
+                status_log.close()
+
+    def complete(self, function_name: str, result: Any):
+        """Store a function's result, wake its dependents and queue it for the checkpoint."""
+        with self._cond:
+            self._results[function_name] = result
+            self._cond.notify_all()
+        # Disk IO happens on the writer thread, never while holding the run lock
+        if self._writer is not None:
+            self._writer.put(function_name, result, time.time())
 
     @classmethod
-    def save_checkpoint(cls, params: Dict[str, Any]):
+    def install_signal_handlers(cls):
+        """Save the checkpoints of running workflows and exit on SIGINT/SIGTERM.
+
+        Not installed by default, so importing the library leaves the process's
+        signal handling untouched. Must be called from the main thread.
+        """
+
+        def handle_interrupt(signum, frame):
+            logger.warning("Received interrupt signal. Saving checkpoint before exit...")
+            for workflow in list(cls._running):
+                try:
+                    workflow.flush_checkpoint()
+                except CheckpointError as e:
+                    logger.error(str(e))
+            sys.exit(1)
+
+        signal.signal(signal.SIGINT, handle_interrupt)
+        signal.signal(signal.SIGTERM, handle_interrupt)
+
+    def flush_checkpoint(self):
+        """Write the completions still queued for the background writer now."""
+        if self._writer is not None:
+            self._append_records(self._writer.drain())
+
+    def _append_records(self, completions: List[Tuple[str, Any, float]]):
+        """Append one checkpoint record and one status line per completed function."""
+        if not completions:
+            return
         try:
-            checkpoint_file = cls._checkpoint_dir / cls.get_checkpoint_filename(params)
-            status = {
-                "parameters": params,
-                "last_updated": datetime.now().isoformat(),
-                "completed_functions": list(cls._results.keys()),
-            }
-
-            with cls._lock:
-                with open(checkpoint_file, "wb") as f:
-                    pickle.dump(cls._results, f)
-                with open(cls._status_file, "w") as f:
-                    json.dump(status, f, indent=2)
+            checkpoint_file = self._get_checkpoint_file(self._params)
+            with self._flush_lock:
+                records = [
+                    {"name": function_name, "result": result}
+                    for function_name, result, _ in completions
+                ]
+                if not checkpoint_file.exists():
+                    records.insert(0, {"parameters": self._params})
+                frames = []
+                for record in records:
+                    blob = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+                    frames.append(_FRAME_HEADER.pack(len(blob)))
+                    frames.append(blob)
+                with open(checkpoint_file, "ab") as f:
+                    f.write(b"".join(frames))
+                    # One fsync covers the whole batch of completions
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                if self._status_log is not None:
+                    self._status_log.write(
+                        b"".join(
+                            _dumps_sorted(
+                                {
+                                    "checkpoint": checkpoint_file.name,
+                                    "function": function_name,
+                                    "completed_at": datetime.fromtimestamp(
+                                        completed_at
+                                    ).isoformat(),
+                                }
+                            )
+                            + b"\n"
+                            for function_name, _, completed_at in completions
+                        )
+                    )
+                    self._status_log.flush()
         except Exception as e:
             raise CheckpointError(f"Failed to save checkpoint: {str(e)}")
 
-    @classmethod
-    def load_checkpoint(cls, params: Dict[str, Any]):
+    def load_checkpoint(self, params: Dict[str, Any]):
         try:
-            checkpoint_file = cls._checkpoint_dir / cls.get_checkpoint_filename(params)
+            checkpoint_file = self._get_checkpoint_file(params)
             if checkpoint_file.exists():
-                with open(checkpoint_file, "rb") as f:
-                    cls._results = pickle.load(f)
+                results = {}
+                with open(checkpoint_file, "r+b") as f:
+                    data = f.read()
+                    offset = 0
+                    while offset + _FRAME_HEADER.size <= len(data):
+                        (length,) = _FRAME_HEADER.unpack_from(data, offset)
+                        end = offset + _FRAME_HEADER.size + length
+                        if end > len(data):
+                            break
+                        record = pickle.loads(data[offset + _FRAME_HEADER.size : end])
+                        if "name" in record:
+                            results[record["name"]] = record["result"]
+                        offset = end
+                    if offset != len(data):
+                        # A save was interrupted mid-frame; drop it so new frames append cleanly
+                        logger.warning(f"Discarding incomplete record in {checkpoint_file}")
+                        f.truncate(offset)
+                with self._lock:
+                    self._results = results
                 logger.info(f"Loaded checkpoint for parameters: {params}")
         except Exception as e:
             raise CheckpointError(f"Failed to load checkpoint: {str(e)}")
 
     @classmethod
-    def depends_on(cls, *dependencies, sleep_time: int = 5):
+    def depends_on(cls, *dependencies, timeout: Optional[float] = None):
+        """Declare the functions a workflow function waits for before it runs.
+
+        If timeout is given, DependencyTimeoutError is raised when the
+        dependencies haven't all completed within that many seconds.
+        """
+        dep_names = [dep.__name__ for dep in dependencies]
+
         def decorator(func):
-            @wraps(func)
             @Profiler.profile
+            @wraps(func)
             def wrapper(params: Dict[str, Any], *args, **kwargs):
                 function_name = func.__name__
+                workflow = _active_workflow.get(None)
 
-                if function_name in cls._results:
-                    logger.info(f"Using cached results for {function_name}")
-                    return cls._results[function_name]
+                # Called outside of a workflow run: behave like the plain function
+                if workflow is None:
+                    return func(params, *args, **kwargs)
 
-                for dep in dependencies:
-                    logger.info(f"Waiting for dependency {dep.__name__}")
-                    while dep.__name__ not in cls._results:
-                        with Timer(f"waiting_for_{dep.__name__}"):
-                            time.sleep(sleep_time)
+                if function_name in workflow._results:
+                    logger.info(f"Using cached results for {function_name}")
+                    return workflow._results[function_name]
+
+                if dep_names:
+                    logger.info(f"Waiting for dependencies {', '.join(dep_names)}")
+                    with Timer(f"waiting_for_dependencies_of_{function_name}"):
+                        with workflow._cond:
+                            ready = workflow._cond.wait_for(
+                                lambda: all(name in workflow._results for name in dep_names),
+                                timeout=timeout,
+                            )
+                            missing = [name for name in dep_names if name not in workflow._results]
+                    if not ready:
+                        raise DependencyTimeoutError(function_name, missing, timeout)
 
                 logger.info(f"Starting {function_name}")
 
                 with Timer(function_name):
                     try:
                         result = func(params, *args, **kwargs)
-
-                        with cls._lock:
-                            cls._results[function_name] = result
-                            cls.save_checkpoint(params)
-
-                        return result
                     except Exception as e:
                         raise WorkflowExecutionError(
                             f"Error in {function_name}: {str(e)}",
@@ -163,16 +447,35 @@ class Workflow:
                             original_error=e,
                         )
 
+                    # A result from a call that broke its resource limits must not
+                    # be stored, or the next run would reuse it from the checkpoint
+                    check_resource_limits()
+                    workflow.complete(function_name, result)
+
+                    return result
+
             return wrapper
 
         return decorator
 
 
+_active_workflow: ContextVar[Workflow] = ContextVar("active_workflow")
+
+
 class WorkflowGenerator:
     """Generates a workflow from a set of functions and dependencies."""
 
     def __init__(self):
         self.nodes: Dict[str, WorkflowNode] = {}
+        # Nodes are numbered in insertion order; graph algorithms work on these ids
+        self._names: List[str] = []
+        self._name_to_id: Dict[str, int] = {}
+        # Number of dependencies of every node, by id, maintained by add_function
+        self._in_degree: List[int] = []
+        # Caches cleared whenever the graph changes: the dependents of every node in
+        # CSR form (node i's are indices[indptr[i]:indptr[i + 1]]) and the last Kahn pass
+        self._edges: Optional[Tuple[List[int], List[int]]] = None
+        self._sorted: Optional[Tuple[List[Set[str]], Set[str]]] = None
 
     def add_function(
         self,
@@ -194,7 +497,12 @@ class WorkflowGenerator:
         if timeout_seconds is not None:
             func = with_timeout(timeout_seconds)(func)
 
-        if func_name not in self.nodes:
+        missing = sorted(dep_names - self.nodes.keys())
+        if missing:
+            raise MissingDependencyError({func_name: missing})
+
+        node = self.nodes.get(func_name)
+        if node is None:
             self.nodes[func_name] = WorkflowNode(
                 func=func,
                 dependencies=dep_names,
@@ -204,112 +512,194 @@ class WorkflowGenerator:
                 memory_limit_mb=memory_limit_mb,
                 cpu_limit_percent=cpu_limit_percent,
             )
-
-        for dep_name in dep_names:
-            if dep_name not in self.nodes:
-                raise MissingDependencyError({func_name: [dep_name]})
+            self._name_to_id[func_name] = len(self._names)
+            self._names.append(func_name)
+            self._in_degree.append(len(dep_names))
+            new_deps = dep_names
+        else:
+            # Re-adding a function extends its dependencies; nothing depends on a new
+            # node yet, so this is the only way a cycle can be introduced
+            new_deps = dep_names - node.dependencies
+            if new_deps:
+                graph = {name: other.dependencies for name, other in self.nodes.items()}
+                graph[func_name] = node.dependencies | new_deps
+                cycle = detect_cycle(graph)
+                if cycle:
+                    raise CyclicDependencyError(cycle)
+                node.dependencies |= new_deps
+                self._in_degree[self._name_to_id[func_name]] += len(new_deps)
+
+        # Dependencies, in-degrees and dependents are updated together so the
+        # cached edges always agree with them
+        for dep_name in new_deps:
             self.nodes[dep_name].dependents.add(func_name)
+        self._edges = None
+        self._sorted = None
 
     def validate_workflow(self):
-        all_deps = {dep for node in self.nodes.values() for dep in node.dependencies}
-        missing_deps = all_deps - set(self.nodes.keys())
-
-        if missing_deps:
-            missing_dep_dict = {}
-            for node_name, node in self.nodes.items():
-                deps = node.dependencies & missing_deps
-                if deps:
-                    missing_dep_dict[node_name] = list(deps)
-            raise MissingDependencyError(missing_dep_dict)
-
-        # Check for cycles using get_dependencies_graph
-        dep_graph = {name: node.dependencies for name, node in self.nodes.items()}
+        missing_dep_dict = {}
+        for node_name, node in self.nodes.items():
+            missing = node.dependencies - self.nodes.keys()
+            if missing:
+                missing_dep_dict[node_name] = list(missing)
 
-        paths = get_dependencies_graph(dep_graph)
+        if missing_dep_dict:
+            raise MissingDependencyError(missing_dep_dict)
 
-        for start, path_list in paths.items():
-            for path in path_list:
-                if len(set(path)) != len(path):
-                    raise CyclicDependencyError(path)
+        # Nodes that Kahn's pass can't reach lie on or behind a cycle; only then
+        # is the graph searched for the cycle itself
+        _, blocked = self._sort_levels()
+        if blocked:
+            raise CyclicDependencyError(
+                detect_cycle({name: self.nodes[name].dependencies for name in blocked})
+            )
 
-    def get_execution_levels(self) -> List[Set[str]]:
+    def _dependent_edges(self) -> Tuple[List[int], List[int]]:
+        if self._edges is None:
+            indptr = [0]
+            indices: List[int] = []
+            for name in self._names:
+                indices.extend(self._name_to_id[dep] for dep in self.nodes[name].dependents)
+                indptr.append(len(indices))
+            self._edges = (indptr, indices)
+        return self._edges
+
+    def _sort_levels(self) -> Tuple[List[Set[str]], Set[str]]:
+        """Kahn's pass, returning the execution levels and the nodes blocked by a cycle."""
+        if self._sorted is not None:
+            return self._sorted
+
+        indptr, indices = self._dependent_edges()
+        in_degree = list(self._in_degree)
+        queue = deque(i for i, degree in enumerate(in_degree) if degree == 0)
+        # A node's level is one past the deepest of its dependencies
+        node_levels = [0] * len(in_degree)
         levels: List[Set[str]] = []
-        remaining = set(self.nodes.keys())
-
-        while remaining:
-            current_level = {
-                node_name
-                for node_name in remaining
-                if not (self.nodes[node_name].dependencies & remaining)
-            }
 
-            if not current_level:
-                raise WorkflowValidationError("Circular dependency detected")
+        while queue:
+            i = queue.popleft()
+            level = node_levels[i]
+            if level == len(levels):
+                levels.append(set())
+            levels[level].add(self._names[i])
+            self.nodes[self._names[i]].level = level
+
+            for j in indices[indptr[i] : indptr[i + 1]]:
+                if node_levels[j] <= level:
+                    node_levels[j] = level + 1
+                in_degree[j] -= 1
+                if in_degree[j] == 0:
+                    queue.append(j)
+
+        blocked = {self._names[i] for i, degree in enumerate(in_degree) if degree != 0}
+        self._sorted = (levels, blocked)
+        return self._sorted
 
-            levels.append(current_level)
-            remaining -= current_level
-
-        return levels
+    def get_execution_levels(self) -> List[Set[str]]:
+        levels, blocked = self._sort_levels()
+        if blocked:
+            raise WorkflowValidationError("Circular dependency detected")
+        # Copies, so callers can't mutate the cached levels
+        return [set(level) for level in levels]
 
     def generate_run_workflow(self, max_workers: int = None) -> Callable:
         self.validate_workflow()
-        execution_levels = self.get_execution_levels()
+        if max_workers is not None and max_workers < 0:
+            raise ValueError("max_workers must not be negative")
+        # As before, None and 0 both select the default pool size
+        if not max_workers:
+            # Widest level; not CPU-capped because nodes are often I/O-bound
+            levels, _ = self._sort_levels()
+            max_workers = max(map(len, levels), default=1)
+
+        # The execution plan depends only on the DAG, so build it once and reuse it every run
+        names = list(self._names)
+        funcs = [self.nodes[name].func for name in names]
+        indptr, indices = self._dependent_edges()
+        initial_in_degree = tuple(self._in_degree)
+        sources = [i for i, degree in enumerate(initial_in_degree) if degree == 0]
+        # Parameter specs in first-use order; each node points at its spec, or -1 for none
+        specs: List[WorkflowParams] = []
+        spec_index: Dict[int, int] = {}
+        node_spec: List[int] = []
+        for name in names:
+            spec = self.nodes[name].params
+            if spec:
+                if id(spec) not in spec_index:
+                    spec_index[id(spec)] = len(specs)
+                    specs.append(spec)
+                node_spec.append(spec_index[id(spec)])
+            else:
+                node_spec.append(-1)
 
         def run_workflow(params: Dict[str, Any]):
             workflow_id = create_unique_id()
             logger.info(f"Starting workflow {workflow_id}")
 
-            # Validate parameters for each function
-            validated_params = {}
-            for node_name, node in self.nodes.items():
-                if node.params:
-                    validated_params[node_name] = node.params.validate(params)
-                else:
-                    validated_params[node_name] = params
+            # Validate parameters once per distinct spec
+            validated = [spec.validate(params) for spec in specs]
+            node_params = [validated[k] if k >= 0 else params for k in node_spec]
 
-            Workflow.initialize(params)
+            workflow = Workflow()
+            workflow.initialize(params)
             results = {}
 
+            # Each node is submitted as soon as its count of unfinished dependencies hits zero
+            in_degree = list(initial_in_degree)
+            ready = list(sources)
+
+            def finish(i: int, result: Any):
+                results[names[i]] = result
+                for j in indices[indptr[i] : indptr[i + 1]]:
+                    in_degree[j] -= 1
+                    if in_degree[j] == 0:
+                        ready.append(j)
+
+            pool = _WorkerPool(workflow, max_workers)
+            # Set once this run fails; a checkpoint write failure must not replace its error
+            failed = False
             try:
-                for level in execution_levels:
-                    if len(level) == 1:
-                        func_name = level.pop()
-                        func = self.nodes[func_name].func
-                        results[func_name] = func(validated_params[func_name])
-                    else:
-                        with ThreadPoolExecutor(max_workers=max_workers or len(level)) as executor:
-                            futures = {
-                                executor.submit(
-                                    self.nodes[func_name].func, validated_params[func_name]
-                                ): func_name
-                                for func_name in level
-                            }
-                            for future in futures:
-                                func_name = futures[future]
-                                results[func_name] = future.result()
+                try:
+                    while ready or pool.pending:
+                        # A lone ready node with nothing else running gains nothing from
+                        # the pool, so run it inline (e.g. every step of a linear chain)
+                        if len(ready) == 1 and not pool.pending:
+                            i = ready.pop()
+                            finish(i, workflow.run(funcs[i], node_params[i]))
+                            continue
+
+                        for i in ready:
+                            pool.submit(i, funcs[i], node_params[i])
+                        ready.clear()
+
+                        finish(*pool.next_completed())
+                finally:
+                    # After a failure, nodes still queued are skipped rather than started
+                    pool.close()
 
                 logger.info(f"Workflow {workflow_id} completed successfully")
-                Profiler.print_stats()  # Print execution statistics
+                if Profiler.enabled:
+                    Profiler.print_stats()  # Print execution statistics
                 return results
 
             except KeyboardInterrupt:
+                failed = True
                 logger.warning(f"Workflow {workflow_id} interrupted by user")
-                Workflow.save_checkpoint(params)  # Save progress before exit
+                workflow.flush_checkpoint()  # Save progress before exit
                 raise KeyboardInterrupt("Workflow was interrupted by user")
             except Exception as e:
+                failed = True
                 logger.error(f"Workflow {workflow_id} failed: {str(e)}")
                 raise
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                try:
+                    workflow.close()
+                except CheckpointError as e:
+                    if not failed:
+                        raise
+                    logger.error(f"Workflow {workflow_id} could not save its checkpoint: {e}")
 
         return run_workflow
-
-
-def handle_interrupt(signum, frame):
-    """Handle interrupt signal"""
-    logger.warning("Received interrupt signal. Saving checkpoint before exit...")
-    # Note: Can't save checkpoint here as we don't have access to current params
-    sys.exit(1)
-
-
-# Register signal handlers
-signal.signal(signal.SIGINT, handle_interrupt)
-signal.signal(signal.SIGTERM, handle_interrupt)
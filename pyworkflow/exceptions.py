@@ -80,6 +80,17 @@ class DependencyExecutionError(WorkflowExecutionError):
             original_error=original_error
         )
 
+class DependencyTimeoutError(WorkflowExecutionError):
+    """Raised when a function's dependencies don't complete within the allowed time."""
+    def __init__(self, function_name: str, pending_dependencies: List[str], timeout: float):
+        self.pending_dependencies = pending_dependencies
+        self.timeout = timeout
+        super().__init__(
+            f"Function '{function_name}' timed out after {timeout} seconds waiting for: "
+            f"{', '.join(pending_dependencies)}",
+            function_name=function_name
+        )
+
 class ParallelExecutionError(WorkflowExecutionError):
     """Raised when there's an error in parallel execution of functions."""
     def __init__(self, failed_functions: Dict[str, Exception]):
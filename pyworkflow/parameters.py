@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any, Optional, Dict
+from typing import Any, Callable, Optional, Dict, List, Tuple
 
 @dataclass
 class ParameterSpec:
@@ -8,32 +8,46 @@ class ParameterSpec:
     description: str = ""
     type: Optional[type] = None
 
+# Builtin types for which an exact type match is by far the most common case
+_EXACT_MATCH_TYPES = {int, str, float, bool, list, dict, tuple}
+
+def _type_checker(expected: type) -> Callable[[Any], bool]:
+    if expected in _EXACT_MATCH_TYPES:
+        return lambda value: type(value) is expected or isinstance(value, expected)
+    return lambda value: isinstance(value, expected)
+
 class WorkflowParams:
     def __init__(self, **parameter_specs: Dict[str, ParameterSpec]):
         self.specs = parameter_specs
 
+        # Specs are fixed after construction, so flatten them once for validate()
+        self._required: List[str] = [name for name, spec in parameter_specs.items() if spec.required]
+        self._defaults: Dict[str, Any] = {
+            name: spec.default
+            for name, spec in parameter_specs.items()
+            if not spec.required and spec.default is not None
+        }
+        self._type_checks: List[Tuple[str, type, Callable[[Any], bool]]] = [
+            (name, spec.type, _type_checker(spec.type))
+            for name, spec in parameter_specs.items()
+            if spec.type
+        ]
+
     def validate(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        validated_params = {}
-        missing_params = []
-
-        # Check required parameters
-        for param_name, spec in self.specs.items():
-            if spec.required and param_name not in params:
-                missing_params.append(param_name)
-            elif param_name not in params and spec.default is not None:
-                validated_params[param_name] = spec.default
-            elif param_name in params:
-                value = params[param_name]
-                if spec.type and not isinstance(value, spec.type):
-                    raise TypeError(f"Parameter '{param_name}' must be of type {spec.type.__name__}, got {type(value).__name__}")
-                validated_params[param_name] = value
+        for param_name, param_type, check in self._type_checks:
+            if param_name in params and not check(params[param_name]):
+                raise TypeError(f"Parameter '{param_name}' must be of type {param_type.__name__}, got {type(params[param_name]).__name__}")
 
+        missing_params = [param_name for param_name in self._required if param_name not in params]
         if missing_params:
             raise ValueError(f"Missing required parameters: {', '.join(missing_params)}")
 
-        # Add any extra parameters that weren't in specs but were provided
-        for param_name, value in params.items():
-            if param_name not in validated_params:
-                validated_params[param_name] = value
+        # Defaults for absent parameters, plus every provided parameter (including extras)
+        validated_params = {
+            param_name: default
+            for param_name, default in self._defaults.items()
+            if param_name not in params
+        }
+        validated_params.update(params)
 
-        return validated_params
\ No newline at end of file
+        return validated_params
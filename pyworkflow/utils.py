@@ -18,15 +18,18 @@ except (ResourceExhaustedError, FunctionTimeoutError) as e:
 """
 import os
 import time
+import itertools
 import psutil
 import logging
-from typing import Any, Dict, Callable, Optional, List, Set, TypeVar
+from typing import Any, Dict, Callable, Optional, List, Set, Tuple, TypeVar
 from pathlib import Path
 from datetime import datetime, timedelta
-import json
 from functools import wraps
 import threading
-from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import queue
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 
 from .exceptions import ResourceExhaustedError, FunctionTimeoutError
 
@@ -34,65 +37,225 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar('T')  # Generic type for function returns
 
+# Handle on the current process, reused instead of building a psutil.Process per call
+_self_process = psutil.Process(os.getpid())
+
+def _reset_self_process() -> None:
+    global _self_process
+    _self_process = psutil.Process(os.getpid())
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_self_process)
+
 def get_memory_usage(pid: Optional[int] = None) -> float:
     """Get memory usage for a process in MB."""
-    process = psutil.Process(pid or os.getpid())
+    process = _self_process if pid is None else psutil.Process(pid)
     return process.memory_info().rss / (1024 * 1024)
 
-def get_cpu_usage(pid: Optional[int] = None) -> float:
-    """Get CPU usage percentage for a process."""
-    process = psutil.Process(pid or os.getpid())
-    return process.cpu_percent(interval=1.0)
+def get_cpu_usage(pid: Optional[int] = None, interval: Optional[float] = 1.0) -> float:
+    """Get CPU usage percentage for a process.
+
+    With interval=None the call doesn't block and reports usage since the previous call.
+    """
+    process = _self_process if pid is None else psutil.Process(pid)
+    return process.cpu_percent(interval=interval)
+
+class _MonitoredCall:
+    """A function call registered with the resource monitor."""
+    def __init__(self, function_name: str, memory_limit_mb: float, cpu_limit_percent: float):
+        self.function_name = function_name
+        self.memory_limit_mb = memory_limit_mb
+        self.cpu_limit_percent = cpu_limit_percent
+        self.breach: Optional[ResourceExhaustedError] = None
+
+    def check(self, memory_usage: Optional[float], cpu_usage: Optional[float]) -> None:
+        if self.breach is not None:
+            return
+        if memory_usage is not None and memory_usage > self.memory_limit_mb:
+            self.breach = ResourceExhaustedError(
+                self.function_name, 'memory',
+                f"{self.memory_limit_mb}MB",
+                f"{memory_usage:.1f}MB"
+            )
+        elif cpu_usage is not None and cpu_usage > self.cpu_limit_percent:
+            self.breach = ResourceExhaustedError(
+                self.function_name, 'CPU',
+                f"{self.cpu_limit_percent}%",
+                f"{cpu_usage:.1f}%"
+            )
+
+class _ResourceMonitor:
+    """Single background thread sampling resource usage for every monitored call."""
+    interval = 1.0
+    _lock = threading.Lock()
+    _calls: Dict[int, _MonitoredCall] = {}
+    _tokens = itertools.count()
+    _thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def register(cls, function_name: str, memory_limit_mb: float, cpu_limit_percent: float) -> int:
+        with cls._lock:
+            if cls._thread is None:
+                get_cpu_usage(interval=None)  # Prime the CPU counter
+                cls._thread = threading.Thread(
+                    target=cls._run, name="resource-monitor", daemon=True
+                )
+                cls._thread.start()
+            token = next(cls._tokens)
+            cls._calls[token] = _MonitoredCall(function_name, memory_limit_mb, cpu_limit_percent)
+            return token
+
+    @classmethod
+    def breach(cls, token: int) -> Optional[ResourceExhaustedError]:
+        """Return the limit breach a monitored call has hit so far, if any."""
+        with cls._lock:
+            call = cls._calls[token]
+            # Fresh memory sample so calls shorter than one tick are still checked
+            call.check(get_memory_usage(), None)
+        return call.breach
+
+    @classmethod
+    def unregister(cls, token: int) -> Optional[ResourceExhaustedError]:
+        """Stop monitoring a call and return the limit breach it hit, if any."""
+        breach = cls.breach(token)
+        with cls._lock:
+            del cls._calls[token]
+        return breach
+
+    @classmethod
+    def _run(cls) -> None:
+        while True:
+            time.sleep(cls.interval)
+            with cls._lock:
+                if not cls._calls:
+                    continue
+                memory_usage = get_memory_usage()
+                cpu_usage = get_cpu_usage(interval=None)
+                for call in cls._calls.values():
+                    call.check(memory_usage, cpu_usage)
+
+# Tokens of the monitored calls enclosing the current one
+_monitored_tokens: contextvars.ContextVar[Tuple[int, ...]] = contextvars.ContextVar(
+    "monitored_tokens", default=()
+)
+
+def check_resource_limits() -> None:
+    """Raise ResourceExhaustedError if a monitored call enclosing this one breached a limit.
+
+    Lets a caller reject a result before storing it, rather than only after the
+    monitored function has returned.
+    """
+    for token in _monitored_tokens.get():
+        breach = _ResourceMonitor.breach(token)
+        if breach is not None:
+            raise breach
 
 def monitor_resources(
     memory_limit_mb: float = float('inf'),
     cpu_limit_percent: float = float('inf')
 ) -> Callable:
-    """Decorator to monitor resource usage of a function."""
+    """Decorator to monitor resource usage of a function.
+
+    Usage is sampled by a shared background thread; a limit breach is raised
+    as ResourceExhaustedError once the function returns, or earlier by
+    check_resource_limits() called from within it.
+    """
+    if memory_limit_mb is None:
+        memory_limit_mb = float('inf')
+    if cpu_limit_percent is None:
+        cpu_limit_percent = float('inf')
+
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
         def wrapper(*args, **kwargs) -> T:
-            pid = os.getpid()
-            
-            def check_resources():
-                while True:
-                    memory_usage = get_memory_usage(pid)
-                    cpu_usage = get_cpu_usage(pid)
-                    
-                    if memory_usage > memory_limit_mb:
-                        raise ResourceExhaustedError(
-                            func.__name__, 'memory',
-                            f"{memory_limit_mb}MB",
-                            f"{memory_usage:.1f}MB"
-                        )
-                    
-                    if cpu_usage > cpu_limit_percent:
-                        raise ResourceExhaustedError(
-                            func.__name__, 'CPU',
-                            f"{cpu_limit_percent}%",
-                            f"{cpu_usage:.1f}%"
-                        )
-                    
-                    time.sleep(1)
-            
-            monitor_thread = threading.Thread(target=check_resources, daemon=True)
-            monitor_thread.start()
-            
-            return func(*args, **kwargs)
+            token = _ResourceMonitor.register(func.__name__, memory_limit_mb, cpu_limit_percent)
+            reset = _monitored_tokens.set(_monitored_tokens.get() + (token,))
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                _monitored_tokens.reset(reset)
+                breach = _ResourceMonitor.unregister(token)
+            if breach is not None:
+                raise breach
+            return result
         return wrapper
     return decorator
 
+def _run_into_future(future: Future, context: contextvars.Context, func: Callable,
+                     args: tuple, kwargs: dict) -> None:
+    """Run func in context on the current thread, storing its outcome in future."""
+    future.set_running_or_notify_cancel()
+    try:
+        result = context.run(func, *args, **kwargs)
+    except BaseException as e:
+        future.set_exception(e)
+    else:
+        future.set_result(result)
+
+class _TimeoutThreads:
+    """Threads shared by with_timeout calls, grown on demand.
+
+    A call is handed to an idle thread if there is one and a new thread is
+    started otherwise, so no call ever waits in a queue behind busy ones
+    (including timed-out calls that are still running). Threads idle for
+    idle_seconds exit.
+    """
+    idle_seconds = 60.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tasks: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        # Threads waiting for a task that no submitted call has claimed yet
+        self._idle = 0
+
+    def submit(self, func: Callable, args: tuple, kwargs: dict) -> Future:
+        future: Future = Future()
+        with self._lock:
+            start_thread = self._idle == 0
+            if not start_thread:
+                self._idle -= 1
+        self._tasks.put((future, contextvars.copy_context(), func, args, kwargs))
+        if start_thread:
+            threading.Thread(target=self._work, name="timeout", daemon=True).start()
+        return future
+
+    def _work(self) -> None:
+        while True:
+            try:
+                task = self._tasks.get(timeout=self.idle_seconds)
+            except queue.Empty:
+                with self._lock:
+                    # Only leave if no call has claimed this thread in the meantime
+                    if self._idle:
+                        self._idle -= 1
+                        return
+                continue
+            _run_into_future(*task)
+            with self._lock:
+                self._idle += 1
+
+_timeout_threads = _TimeoutThreads()
+
+def _reset_timeout_threads() -> None:
+    # Threads don't survive a fork, so a child starts with no idle ones
+    global _timeout_threads
+    _timeout_threads = _TimeoutThreads()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_timeout_threads)
+
 def with_timeout(timeout_seconds: int) -> Callable:
     """Decorator to add timeout to a function."""
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
         def wrapper(*args, **kwargs) -> T:
-            with ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(func, *args, **kwargs)
-                try:
-                    return future.result(timeout=timeout_seconds)
-                except TimeoutError:
-                    raise FunctionTimeoutError(func.__name__, timeout_seconds)
+            # Runs in a copy of the caller's context so context variables (such as
+            # the active workflow run) are visible to func
+            future = _timeout_threads.submit(func, args, kwargs)
+            try:
+                return future.result(timeout=timeout_seconds)
+            except (TimeoutError, FuturesTimeoutError):
+                raise FunctionTimeoutError(func.__name__, timeout_seconds)
         return wrapper
     return decorator
 
@@ -104,11 +267,11 @@ class Timer:
         self.end_time = None
 
     def __enter__(self):
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.end_time = time.time()
+        self.end_time = time.perf_counter()
         duration = self.end_time - self.start_time
         logger.info(f"{self.name} took {duration:.2f} seconds")
 
@@ -141,74 +304,115 @@ def format_time_delta(delta: timedelta) -> str:
 
 def flatten_dict(d: Dict[str, Any], parent_key: str = '', sep: str = '.') -> Dict[str, Any]:
     """Flatten a nested dictionary."""
-    items: List[tuple] = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
-        else:
-            items.append((new_key, v))
-    return dict(items)
-
-def get_dependencies_graph(dependencies: Dict[str, Set[str]]) -> Dict[str, List[List[str]]]:
-    """Get all possible paths through a dependency graph."""
-    def find_paths(start: str, end: str, path: List[str]) -> List[List[str]]:
-        path = path + [start]
-        if start == end:
-            return [path]
-        paths = []
-        for node in dependencies.get(start, []):
-            if node not in path:
-                new_paths = find_paths(node, end, path)
-                paths.extend(new_paths)
-        return paths
-
-    result = {}
-    nodes = set().union(*[{k} | v for k, v in dependencies.items()])
-    
-    for start in nodes:
-        result[start] = []
-        for end in nodes:
-            if start != end:
-                paths = find_paths(start, end, [])
-                if paths:
-                    result[start].extend(paths)
-    
-    return result
+    flat: Dict[str, Any] = {}
+    stack = [(parent_key, d)]
+    while stack:
+        prefix, current = stack.pop()
+        for k, v in current.items():
+            new_key = f"{prefix}{sep}{k}" if prefix else k
+            if isinstance(v, dict):
+                stack.append((new_key, v))
+            else:
+                flat[new_key] = v
+    return flat
+
+def detect_cycle(dependencies: Dict[str, Set[str]]) -> Optional[List[str]]:
+    """Return a dependency cycle as a path of node names, or None if the graph is acyclic."""
+    in_degree = {node: 0 for node in dependencies}
+    dependents: Dict[str, List[str]] = {node: [] for node in dependencies}
+    for node, deps in dependencies.items():
+        for dep in deps:
+            if dep in dependents:
+                in_degree[node] += 1
+                dependents[dep].append(node)
+
+    # Kahn's algorithm: peel off nodes whose dependencies are all resolved
+    ready = [node for node, degree in in_degree.items() if degree == 0]
+    while ready:
+        node = ready.pop()
+        for dependent in dependents[node]:
+            in_degree[dependent] -= 1
+            if in_degree[dependent] == 0:
+                ready.append(dependent)
+
+    remaining = {node for node, degree in in_degree.items() if degree > 0}
+    if not remaining:
+        return None
+
+    # Every remaining node still depends on another remaining node, so following
+    # those edges from any of them must eventually revisit a node on the path.
+    path: List[str] = []
+    position: Dict[str, int] = {}
+    node = next(iter(remaining))
+    while node not in position:
+        position[node] = len(path)
+        path.append(node)
+        node = next(dep for dep in dependencies[node] if dep in remaining)
+    return path[position[node]:] + [node]
+
+class _RunningStats:
+    """Constant-memory aggregate of a function's execution times, kept in nanoseconds."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns: Optional[int] = None
+        self.max_ns: Optional[int] = None
+
+    def update(self, duration_ns: int) -> None:
+        with self.lock:
+            self.count += 1
+            self.total_ns += duration_ns
+            if self.min_ns is None or duration_ns < self.min_ns:
+                self.min_ns = duration_ns
+            if self.max_ns is None or duration_ns > self.max_ns:
+                self.max_ns = duration_ns
+
+    def as_dict(self) -> Dict[str, float]:
+        with self.lock:
+            return {
+                'count': self.count,
+                'total': self.total_ns / 1e9,
+                'average': self.total_ns / self.count / 1e9,
+                'min': self.min_ns / 1e9,
+                'max': self.max_ns / 1e9
+            }
 
 class Profiler:
-    """Simple profiler for tracking function execution times."""
-    _timings: Dict[str, List[float]] = {}
-    
+    """Simple profiler for tracking function execution times.
+
+    Profiling is opt-in: set ``Profiler.enabled = True`` to start recording.
+    """
+    enabled = False
+    _stats: Dict[str, _RunningStats] = {}
+
     @classmethod
     def profile(cls, func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
-            start_time = time.time()
+            if not cls.enabled:
+                return func(*args, **kwargs)
+
+            start_time = time.perf_counter_ns()
             result = func(*args, **kwargs)
-            duration = time.time() - start_time
-            
-            if func.__name__ not in cls._timings:
-                cls._timings[func.__name__] = []
-            cls._timings[func.__name__].append(duration)
-            
+            duration_ns = time.perf_counter_ns() - start_time
+
+            stats = cls._stats.get(func.__name__)
+            if stats is None:
+                stats = cls._stats.setdefault(func.__name__, _RunningStats())
+            stats.update(duration_ns)
+
             return result
         return wrapper
-    
+
     @classmethod
     def get_stats(cls) -> Dict[str, Dict[str, float]]:
-        stats = {}
-        for func_name, times in cls._timings.items():
-            if times:
-                stats[func_name] = {
-                    'count': len(times),
-                    'total': sum(times),
-                    'average': sum(times) / len(times),
-                    'min': min(times),
-                    'max': max(times)
-                }
-        return stats
-    
+        return {
+            func_name: stats.as_dict()
+            for func_name, stats in list(cls._stats.items())
+            if stats.count
+        }
+
     @classmethod
     def print_stats(cls):
         stats = cls.get_stats()
@@ -38,3 +38,21 @@ def test_missing_dependency_detection():
     # Add function with non-existent dependency
     with pytest.raises(MissingDependencyError):
         generator.add_function(dependent, [existing, "non_existent_function"])
+
+
+def test_readding_function_extends_dependencies():
+    """Test that re-adding a function with new dependencies keeps the graph consistent."""
+    generator = WorkflowGenerator()
+
+    def first(params):
+        return 1
+
+    def second(params):
+        return 2
+
+    generator.add_function(first)
+    generator.add_function(second)
+    generator.add_function(first, [second])
+
+    assert generator.get_execution_levels() == [{"second"}, {"first"}]
+    assert generator.generate_run_workflow()({}) == {"first": 1, "second": 2}
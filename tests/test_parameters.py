@@ -1,6 +1,13 @@
+import enum
+
 import pytest
 from pyworkflow.core import WorkflowGenerator, Workflow
-from pyworkflow.exceptions import CyclicDependencyError, MissingDependencyError
+from pyworkflow.exceptions import (
+    CheckpointError,
+    CyclicDependencyError,
+    MissingDependencyError,
+    WorkflowExecutionError,
+)
 
 
 def test_parameter_validation(params_workflow):
@@ -32,10 +39,7 @@ def test_checkpoint_creation(simple_workflow):
     # First run should create checkpoint
     results1 = run_workflow(params)
 
-    # Clean results and run again
-    Workflow._results.clear()
-
-    # Second run should load from checkpoint
+    # Second run starts with fresh in-memory results and should load from checkpoint
     results2 = run_workflow(params)
 
     assert results1 == results2
@@ -74,3 +78,101 @@ def test_checkpoint_recovery():
 
     # The successful function should not have run again
     assert results == ["fail"]
+
+
+def test_checkpoint_filename_computed_once_per_run(simple_workflow, monkeypatch):
+    """Test that parameters are hashed once per run, not on every save."""
+    calls = []
+    original = Workflow.get_checkpoint_filename.__func__
+
+    def counting_get_checkpoint_filename(cls, params):
+        calls.append(params)
+        return original(cls, params)
+
+    monkeypatch.setattr(
+        Workflow, "get_checkpoint_filename", classmethod(counting_get_checkpoint_filename)
+    )
+
+    run_workflow = simple_workflow.generate_run_workflow()
+    run_workflow({"value": 42})
+
+    assert len(calls) == 1
+
+
+class Mode(enum.IntEnum):
+    A = 1
+
+
+def test_checkpoint_filename_distinguishes_params():
+    """Test that distinct parameters never share a checkpoint, and unhashable ones fail loudly."""
+    assert Workflow.get_checkpoint_filename({"x": 2**70}) != Workflow.get_checkpoint_filename(
+        {"x": 2**70 + 1}
+    )
+    assert Workflow.get_checkpoint_filename({"x": 1}) != Workflow.get_checkpoint_filename(
+        {"x": True}
+    )
+    assert Workflow.get_checkpoint_filename({"x": {"b": 1, "a": 2}}) == (
+        Workflow.get_checkpoint_filename({"x": {"a": 2, "b": 1}})
+    )
+    # Encoded as json.dumps would: tuples as lists, int subclasses as their value
+    assert Workflow.get_checkpoint_filename({"x": (3, 4)}) == (
+        Workflow.get_checkpoint_filename({"x": [3, 4]})
+    )
+    assert Workflow.get_checkpoint_filename({"x": Mode.A}) == (
+        Workflow.get_checkpoint_filename({"x": 1})
+    )
+
+    for params in ({"x": float("nan")}, {"x": float("inf")}, {"x": {1: "a"}}, {"x": object()}):
+        with pytest.raises(CheckpointError):
+            Workflow.get_checkpoint_filename(params)
+
+
+def test_load_checkpoint_uses_given_params(simple_workflow):
+    """Test that load_checkpoint reads the checkpoint of the params it is given."""
+    run_workflow = simple_workflow.generate_run_workflow()
+    run_workflow({"value": 1})
+    expected = run_workflow({"value": 2})
+
+    workflow = Workflow()
+    workflow.initialize({"value": 1})
+    try:
+        workflow.load_checkpoint({"value": 2})
+        assert workflow._results == expected
+    finally:
+        workflow.close()
+
+
+def test_checkpoint_failure_does_not_mask_node_error(monkeypatch):
+    """Test that a node's error is reported even when saving the checkpoint also fails."""
+
+    def failing_append(self, completions):
+        raise CheckpointError("disk full")
+
+    monkeypatch.setattr(Workflow, "_append_records", failing_append)
+    generator = WorkflowGenerator()
+
+    @Workflow.depends_on()
+    def ok(params):
+        return 1
+
+    @Workflow.depends_on(ok)
+    def fail(params):
+        raise ValueError("boom")
+
+    generator.add_function(ok)
+    generator.add_function(fail, [ok])
+
+    with pytest.raises(WorkflowExecutionError, match="boom"):
+        generator.generate_run_workflow()({})
+
+    generator = WorkflowGenerator()
+    generator.add_function(ok)
+    with pytest.raises(CheckpointError, match="disk full"):
+        generator.generate_run_workflow()({})
+
+    # Also when the run is retried from an except block, as in the README's resume example
+    with pytest.raises(CheckpointError, match="disk full"):
+        try:
+            raise KeyboardInterrupt
+        except KeyboardInterrupt:
+            generator.generate_run_workflow()({})
@@ -4,8 +4,9 @@ from pyworkflow.core import WorkflowGenerator, Workflow
 from pyworkflow.utils import Profiler
 
 
-def test_execution_profiling():
+def test_execution_profiling(monkeypatch):
     """Test execution time profiling."""
+    monkeypatch.setattr(Profiler, "enabled", True)
     generator = WorkflowGenerator()
 
     @Workflow.depends_on()
@@ -21,3 +22,14 @@ def test_execution_profiling():
     stats = Profiler.get_stats()
     assert "timed_function" in stats
     assert stats["timed_function"]["total"] >= 0.1
+
+
+def test_profiling_disabled_by_default():
+    """Test that nothing is recorded unless profiling is enabled."""
+
+    @Profiler.profile
+    def unprofiled_function():
+        return True
+
+    assert unprofiled_function()
+    assert "unprofiled_function" not in Profiler.get_stats()
@@ -1,4 +1,5 @@
-from pyworkflow.core import WorkflowGenerator
+import time
+from pyworkflow.core import WorkflowGenerator, Workflow
 from pyworkflow.exceptions import ResourceExhaustedError, FunctionTimeoutError
 import pytest
 
@@ -21,6 +22,29 @@ def test_memory_limit():
         run_workflow({})
 
 
+def test_limit_breach_is_not_checkpointed():
+    """Test that the result of a function breaching its limits isn't checkpointed."""
+    generator = WorkflowGenerator()
+
+    @Workflow.depends_on()
+    def over_limit(params):
+        return True
+
+    generator.add_function(over_limit, memory_limit_mb=1)  # Below any process's footprint
+
+    run_workflow = generator.generate_run_workflow()
+
+    with pytest.raises(ResourceExhaustedError):
+        run_workflow({})
+
+    workflow = Workflow()
+    workflow.initialize({})
+    try:
+        assert "over_limit" not in workflow._results
+    finally:
+        workflow.close()
+
+
 def test_timeout():
     """Test function timeout."""
     generator = WorkflowGenerator()
@@ -36,3 +60,21 @@ def test_timeout():
 
     with pytest.raises(FunctionTimeoutError):
         run_workflow({})
+
+
+def test_timeout_excludes_time_waiting_for_others():
+    """Test that parallel timed functions don't spend their timeout waiting on each other."""
+    generator = WorkflowGenerator()
+
+    for i in range(10):
+
+        def sleeper(params):
+            time.sleep(0.6)
+            return True
+
+        sleeper.__name__ = f"sleeper_{i}"
+        generator.add_function(sleeper, timeout_seconds=1)
+
+    run_workflow = generator.generate_run_workflow(max_workers=10)
+
+    assert all(run_workflow({}).values())
@@ -1,4 +1,4 @@
-from pyworkflow.utils import Timer, flatten_dict
+from pyworkflow.utils import Timer, detect_cycle, flatten_dict
 import time
 
 
@@ -17,3 +17,13 @@ def test_flatten_dict():
     flat = flatten_dict(nested)
 
     assert flat == {"a": 1, "b.c": 2, "b.d.e": 3}
+
+
+def test_detect_cycle():
+    """Test cycle detection on dependency graphs."""
+    assert detect_cycle({"a": set(), "b": {"a"}, "c": {"a", "b"}}) is None
+
+    cycle = detect_cycle({"a": set(), "b": {"a", "d"}, "c": {"b"}, "d": {"c"}})
+
+    assert cycle[0] == cycle[-1]
+    assert set(cycle) == {"b", "c", "d"}
@@ -1,5 +1,9 @@
 from pyworkflow.core import Workflow, WorkflowGenerator
-from pyworkflow.exceptions import CyclicDependencyError, MissingDependencyError
+from pyworkflow.exceptions import (
+    CyclicDependencyError,
+    DependencyTimeoutError,
+    MissingDependencyError,
+)
 import pytest
 import time
 
@@ -66,3 +70,87 @@ def test_parallel_execution():
     # Both functions should run in parallel, taking ~1 second total
     assert duration < 1.5  # Allow some overhead
     assert set(results) == {"slow1", "slow2"}
+
+
+def test_default_pool_covers_widest_level():
+    """Test that the default pool runs every node of the widest level at once."""
+    generator = WorkflowGenerator()
+
+    for i in range(4):
+
+        def slow(params):
+            time.sleep(0.5)
+            return True
+
+        slow.__name__ = f"slow_{i}"
+        generator.add_function(slow)
+
+    start_time = time.time()
+    generator.generate_run_workflow()({})
+    duration = time.time() - start_time
+
+    # Not limited by the CPU count: all four sleep concurrently
+    assert duration < 0.9
+
+
+def test_zero_max_workers_uses_default_pool():
+    """Test that max_workers=0 picks the default pool size instead of starting no workers."""
+    generator = WorkflowGenerator()
+
+    def first(params):
+        return 1
+
+    def second(params):
+        return 2
+
+    generator.add_function(first)
+    generator.add_function(second)
+
+    assert generator.generate_run_workflow(max_workers=0)({}) == {"first": 1, "second": 2}
+
+    with pytest.raises(ValueError):
+        generator.generate_run_workflow(max_workers=-1)
+
+
+def test_execution_levels():
+    """Test that functions are grouped into dependency levels."""
+    generator = WorkflowGenerator()
+
+    @Workflow.depends_on()
+    def root(params):
+        return 0
+
+    @Workflow.depends_on(root)
+    def left(params):
+        return 1
+
+    @Workflow.depends_on(root)
+    def right(params):
+        return 2
+
+    @Workflow.depends_on(left, right)
+    def join(params):
+        return 3
+
+    generator.add_function(root)
+    generator.add_function(left, [root])
+    generator.add_function(right, [root])
+    generator.add_function(join, [left, right])
+
+    assert generator.get_execution_levels() == [{"root"}, {"left", "right"}, {"join"}]
+    assert generator.nodes["join"].level == 2
+
+
+def test_dependency_timeout():
+    """Test that waiting on an unfinished dependency can time out."""
+
+    @Workflow.depends_on()
+    def never_run(params):
+        return 1
+
+    @Workflow.depends_on(never_run, timeout=0.1)
+    def dependent(params):
+        return 2
+
+    with pytest.raises(DependencyTimeoutError):
+        Workflow().run(dependent, {})